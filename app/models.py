@@ -0,0 +1,64 @@
+"""Modelos de dados dos indicadores de manutenção do COMG."""
+
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+METRIC_FIELDS = (
+    "corrective_building",
+    "corrective_engineering",
+    "preventive_building",
+    "preventive_infra",
+    "active_search",
+)
+
+
+class ServiceOrder(BaseModel):
+    """Ordem de serviço como devolvida pela API do Arkmeds."""
+
+    id: int
+    numero: str | None = None
+    tipo_servico: str | None = None
+    estado: str | None = None
+    quadro: str | None = None
+    prioridade: str | None = None
+    data_criacao: str | None = None
+    data_fechamento: str | None = None
+    descricao: str | None = None
+
+
+class Equipment(BaseModel):
+    """Equipamento do inventário acompanhado pela engenharia clínica."""
+
+    id: int
+    nome: str | None = None
+    setor: str | None = None
+    marca: str | None = None
+    modelo: str | None = None
+    data_aquisicao: str | None = None
+
+
+class Chamado(BaseModel):
+    """Chamado de manutenção aberto para um equipamento.
+
+    ``data_criacao_os`` e as datas dentro de ``ordem_servico`` chegam no
+    formato "DD/MM/AA - HH:MM" usado pela API do Arkmeds.
+    """
+
+    id: int
+    equipamento_id: int | None = None
+    data_criacao_os: str | None = None
+    ordem_servico: dict | None = None
+
+
+class OSMetrics(BaseModel):
+    """Contagem de ordens de serviço fechadas no período, por categoria."""
+
+    corrective_building: int = 0
+    corrective_engineering: int = 0
+    preventive_building: int = 0
+    preventive_infra: int = 0
+    active_search: int = 0
+    total_closed: int = 0
+    total_open: int = 0
+    sla_percentage: float = 0.0
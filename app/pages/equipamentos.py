@@ -0,0 +1,505 @@
+"""Página de equipamentos e histórico de manutenção do COMG.
+
+Complementa o dashboard de OS com a visão por equipamento: inventário,
+MTTR/MTBF mensais e ranking de confiabilidade, calculados a partir dos
+chamados corretivos da API do Arkmeds.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import re
+import time
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from app.models import Chamado, Equipment
+from app.services.arkmeds_client import ArkmedsClient
+from app.utils.async_utils import run_async_safe, submit_async
+
+# Formato de data usado pela API do Arkmeds nos chamados.
+FORMATO_DATA_ARKMEDS = "%d/%m/%y - %H:%M"
+
+# Id do tipo "Manutenção Corretiva" nos chamados da API.
+TIPO_CORRETIVA = 3
+
+# Cache quente em Parquet dos frames já convertidos: um processo novo do
+# Streamlit (restart, novo worker) lê as colunas prontas do disco em vez
+# de refazer a busca na API e o parse — sem serializar modelo nenhum.
+PARQUET_EQUIPAMENTOS = Path("data/equipamentos.parquet")
+PARQUET_CHAMADOS = Path("data/chamados.parquet")
+
+# TTL adaptativo do cache quente: começa curto e dobra a cada refetch que
+# volta sem chamado novo (fora do expediente o dado é quase estático);
+# qualquer mudança devolve o TTL ao mínimo para acompanhar o horário de
+# pico de abertura de OS.
+PARQUET_TTL_MIN = 15 * 60
+PARQUET_TTL_MAX = 4 * 3600
+_parquet_ttl = PARQUET_TTL_MIN
+_ultimo_snapshot: tuple[int, int] | None = None
+
+
+def _ajusta_ttl(os_hist: list[Chamado]) -> None:
+    global _parquet_ttl, _ultimo_snapshot
+    snapshot = (len(os_hist), max((o.id for o in os_hist), default=0))
+    if snapshot == _ultimo_snapshot:
+        _parquet_ttl = min(_parquet_ttl * 2, PARQUET_TTL_MAX)
+    else:
+        _parquet_ttl = PARQUET_TTL_MIN
+    _ultimo_snapshot = snapshot
+
+
+# Memo em processo do resultado do fetch, chaveado pelos mtimes dos
+# arquivos Parquet: enquanto o cache em disco não muda, cada rerun
+# recebe os MESMOS objetos de frame — o que também faz os caches por
+# identidade da sessão (tabela, histórico, CSV) acertarem direto.
+_eq_mem: tuple[tuple[float, float], "EquipmentData"] | None = None
+
+
+def _chave_parquet() -> tuple[float, float] | None:
+    try:
+        return (
+            PARQUET_EQUIPAMENTOS.stat().st_mtime,
+            PARQUET_CHAMADOS.stat().st_mtime,
+        )
+    except OSError:
+        return None
+
+
+def _frames_do_parquet() -> tuple[pd.DataFrame, pd.DataFrame] | None:
+    """Lê os frames do cache em disco, se ambos existirem e forem recentes."""
+    try:
+        limite = time.time() - _parquet_ttl
+        if (
+            PARQUET_EQUIPAMENTOS.stat().st_mtime < limite
+            or PARQUET_CHAMADOS.stat().st_mtime < limite
+        ):
+            return None
+        return pd.read_parquet(PARQUET_EQUIPAMENTOS), pd.read_parquet(PARQUET_CHAMADOS)
+    except OSError:
+        return None
+
+
+def _grava_parquet(equip_df: pd.DataFrame, os_df: pd.DataFrame) -> None:
+    """Persiste os frames convertidos; falha de disco não derruba o fetch."""
+    try:
+        PARQUET_EQUIPAMENTOS.parent.mkdir(parents=True, exist_ok=True)
+        equip_df.to_parquet(PARQUET_EQUIPAMENTOS, compression="zstd")
+        os_df.to_parquet(PARQUET_CHAMADOS, compression="zstd")
+    except OSError:
+        pass
+
+
+# Equivalente pré-compilado de FORMATO_DATA_ARKMEDS: cinco grupos de
+# dígitos e construção direta do datetime, sem o interpretador de
+# formato do strptime a cada chamada.
+_PADRAO_DATA = re.compile(r"(\d{2})/(\d{2})/(\d{2}) - (\d{2}):(\d{2})$")
+
+
+@lru_cache(maxsize=None)
+def _parse_cached(valor: str) -> datetime | None:
+    """Parse memoizado de uma data da API.
+
+    As mesmas strings de data reaparecem várias vezes na montagem do
+    histórico e da tabela (agrupamento, chave de ordenação, intervalos);
+    o cache reduz cada repetição a um lookup em dict.
+    """
+    m = _PADRAO_DATA.match(valor)
+    if m is None:
+        return None
+    dia, mes, ano, hora, minuto = map(int, m.groups())
+    try:
+        return datetime(2000 + ano, mes, dia, hora, minuto)
+    except ValueError:
+        return None
+
+
+def parse_datetime(valor: str | datetime | None) -> datetime | None:
+    """Converte uma data no formato da API ("DD/MM/AA - HH:MM") em datetime.
+
+    Valores que já chegam como ``datetime`` (payloads pré-convertidos)
+    voltam direto, sem passar pelo ``strptime`` nem pelo cache.
+    """
+    if isinstance(valor, datetime):
+        return valor
+    if not valor or not isinstance(valor, str):
+        return None
+    return _parse_cached(valor)
+
+
+@st.cache_resource
+def _client() -> ArkmedsClient:
+    """Cliente único por processo, compartilhando o pool de conexões."""
+    return ArkmedsClient.from_session()
+
+
+class EquipmentData(NamedTuple):
+    """Par de frames colunarizados que a página consome.
+
+    Só DataFrames cruzam a fronteira do fetch — nada de listas de
+    modelos pydantic para copiar ou serializar nos caches.
+    """
+
+    equip_df: pd.DataFrame
+    os_df: pd.DataFrame
+
+
+def _equip_df(equip_list: list[Equipment]) -> pd.DataFrame:
+    """Materializa o inventário em DataFrame uma única vez por fetch.
+
+    Colunar desde a origem: uma lista por campo, sem o dict transitório
+    de ``model_dump`` por equipamento — cada coluna vira um bloco só.
+    """
+    return pd.DataFrame(
+        {campo: [getattr(e, campo) for e in equip_list] for campo in Equipment.model_fields}
+    )
+
+
+def _os_df(os_hist: list[Chamado]) -> pd.DataFrame:
+    """Chamados em formato colunar, com as datas convertidas de uma vez.
+
+    O parse das strings de data acontece aqui, uma única vez por fetch;
+    histórico, tabela e status leem as mesmas colunas ``datetime64`` em
+    vez de cada seção reconverter as mesmas strings.
+    """
+    df = pd.DataFrame(
+        {
+            "eq": [o.equipamento_id for o in os_hist],
+            "cria": [o.data_criacao_os for o in os_hist],
+            "fech": [
+                o.ordem_servico.get("data_fechamento") if o.ordem_servico else None
+                for o in os_hist
+            ],
+        }
+    )
+    df["cria"] = pd.to_datetime(
+        df["cria"], format=FORMATO_DATA_ARKMEDS, errors="coerce", cache=True
+    )
+    df["fech"] = pd.to_datetime(
+        df["fech"], format=FORMATO_DATA_ARKMEDS, errors="coerce", cache=True
+    )
+    df["mes"] = df["cria"].dt.to_period("M").dt.to_timestamp()
+    return df
+
+
+async def fetch_equipment_data_async(client: ArkmedsClient) -> EquipmentData:
+    """Busca o inventário e o histórico de chamados corretivos.
+
+    As duas chamadas à API correm em paralelo no mesmo gather — o tempo
+    de busca é o da mais lenta, não a soma. Os DataFrames do inventário
+    e dos chamados são montados aqui e repassados aos consumidores —
+    ``model_dump`` e parse de datas acontecem uma vez por fetch, não uma
+    vez por seção renderizada, e ficam persistidos em Parquet para o
+    próximo processo partir quente.
+    """
+    global _eq_mem
+    chave = _chave_parquet()
+    fresco = chave is not None and min(chave) >= time.time() - _parquet_ttl
+    if fresco and _eq_mem is not None and _eq_mem[0] == chave:
+        return _eq_mem[1]
+    cacheados = _frames_do_parquet()
+    if cacheados is not None:
+        dados = EquipmentData(*cacheados)
+        _eq_mem = (chave, dados)
+        return dados
+    equip_list, os_hist = await asyncio.gather(
+        client.list_equipment(),
+        client.list_chamados({"tipo_id": TIPO_CORRETIVA}),
+        return_exceptions=True,
+    )
+    if isinstance(equip_list, BaseException):
+        raise equip_list
+    if isinstance(os_hist, BaseException):
+        # Sem histórico a página ainda serve o inventário; os indicadores
+        # de manutenção saem zerados.
+        os_hist = []
+    equip_df = _equip_df(equip_list)
+    os_df = _os_df(os_hist)
+    _ajusta_ttl(os_hist)
+    _grava_parquet(equip_df, os_df)
+    dados = EquipmentData(equip_df, os_df)
+    chave = _chave_parquet()
+    if chave is not None:
+        _eq_mem = (chave, dados)
+    return dados
+
+
+def fetch_equipment_data(client: ArkmedsClient) -> EquipmentData:
+    return run_async_safe(fetch_equipment_data_async(client))
+
+
+_stats_mem: tuple[float, pd.DataFrame] | None = None
+
+
+async def fetch_advanced_stats_async(client: ArkmedsClient) -> pd.DataFrame:
+    """Volume mensal de chamados corretivos, para a análise avançada.
+
+    A contagem sai de um ``value_counts`` sobre a coluna de mês já
+    convertida — sem dict de acumulação nem parse por chamado — e fica
+    memoizada no processo pelo mesmo TTL adaptativo do cache quente.
+    """
+    global _stats_mem
+    if _stats_mem is not None and time.time() - _stats_mem[0] < _parquet_ttl:
+        return _stats_mem[1]
+    chamados = await client.list_chamados({"tipo_id": TIPO_CORRETIVA})
+    contagem = _os_df(chamados)["mes"].value_counts().sort_index()
+    stats_df = pd.DataFrame({"mes": contagem.index, "chamados": contagem.to_numpy()})
+    _stats_mem = (time.time(), stats_df)
+    return stats_df
+
+
+async def fetch_mttf_mtbf_data_async(client: ArkmedsClient) -> pd.DataFrame:
+    """Tabela de MTTR/MTBF por equipamento, para o ranking de confiabilidade."""
+    equip_list = await client.list_equipment()
+    os_hist = await client.list_chamados({"tipo_id": TIPO_CORRETIVA})
+    return _build_equipment_table(_equip_df(equip_list), _os_df(os_hist))
+
+
+# Cache stale-while-revalidate do ranking: dentro do prazo "fresco" o
+# valor é servido direto; entre "fresco" e "velho" o valor antigo ainda é
+# servido na hora e a renovação corre em segundo plano — o usuário nunca
+# espera o recálculo pesado.
+MTTF_TTL_FRESCO = 30 * 60
+MTTF_TTL_VELHO = 24 * 3600
+
+_mttf_cache: tuple[pd.DataFrame, float, float] | None = None
+_mttf_renovando = False
+
+
+async def _renovar_mttf(client: ArkmedsClient) -> None:
+    global _mttf_cache, _mttf_renovando
+    try:
+        valor = await fetch_mttf_mtbf_data_async(client)
+        agora = time.monotonic()
+        _mttf_cache = (valor, agora + MTTF_TTL_FRESCO, agora + MTTF_TTL_VELHO)
+    finally:
+        _mttf_renovando = False
+
+
+async def fetch_mttf_mtbf_cached(client: ArkmedsClient) -> pd.DataFrame:
+    """Ranking com cache SWR: só o primeiro acesso frio bloqueia."""
+    global _mttf_cache, _mttf_renovando
+    agora = time.monotonic()
+    if _mttf_cache is not None:
+        valor, fresco_ate, velho_ate = _mttf_cache
+        if agora < fresco_ate:
+            return valor
+        if agora < velho_ate:
+            if not _mttf_renovando:
+                _mttf_renovando = True
+                submit_async(_renovar_mttf(client))
+            return valor
+    valor = await fetch_mttf_mtbf_data_async(client)
+    _mttf_cache = (valor, agora + MTTF_TTL_FRESCO, agora + MTTF_TTL_VELHO)
+    return valor
+
+
+def _build_history_df(os_df: pd.DataFrame) -> pd.DataFrame:
+    """Série mensal de MTTR e MTBF a partir dos chamados corretivos.
+
+    Opera sobre o frame colunar montado no fetch (datas já convertidas
+    em ``_os_df``): o MTTR sai de um groupby mensal e o MTBF de um diff
+    por equipamento — nenhum ``strptime`` por chamado aqui.
+    """
+    df = os_df
+
+    # MTTR: média mensal das horas entre abertura e fechamento.
+    reparo_h = (df["fech"] - df["cria"]).dt.total_seconds() / 3600
+    mttr = reparo_h.groupby(df["mes"]).mean().dropna()
+
+    # MTBF: intervalos entre chamados consecutivos do mesmo equipamento,
+    # agregados no mês em que o intervalo termina. Um único sort +
+    # ``groupby().diff()`` em C no lugar do laço Python por grupo.
+    ordenado = df.dropna(subset=["cria"]).sort_values(["eq", "cria"])
+    intervalo_h = ordenado.groupby("eq")["cria"].diff().dt.total_seconds() / 3600
+    mtbf = intervalo_h.groupby(ordenado["mes"]).mean().dropna()
+
+    # União dos meses por alinhamento de índice no concat — sem set de
+    # objetos de data nem um ``get`` por mês na montagem final.
+    hist = (
+        pd.concat({"mttr_h": mttr, "mtbf_h": mtbf}, axis=1)
+        .sort_index()
+        .fillna(0.0)
+        .round(1)
+    )
+    return hist.rename_axis("mes").reset_index()
+
+
+def _build_equipment_table(equip_df: pd.DataFrame, os_df: pd.DataFrame) -> pd.DataFrame:
+    """Tabela por equipamento com contagem de chamados, idade, MTTR e MTBF.
+
+    Recebe o inventário e os chamados já em DataFrames montados no fetch
+    — nenhum ``model_dump`` nem parse de string de data acontece aqui.
+    """
+    df = equip_df.copy()
+    hoje = pd.Timestamp(date.today())
+    aquisicao = pd.to_datetime(df["data_aquisicao"], errors="coerce")
+    df["idade_anos"] = ((hoje - aquisicao).dt.days / 365).round(1)
+
+    # Uma única ordenação global por (equipamento, data de criação) e
+    # agregações groupby em C — sem laço Python por equipamento.
+    ordenado = os_df.dropna(subset=["cria"]).sort_values(["eq", "cria"])
+    reparo_h = (ordenado["fech"] - ordenado["cria"]).dt.total_seconds() / 3600
+    mttr = reparo_h.groupby(ordenado["eq"]).mean()
+    intervalo_h = ordenado.groupby("eq")["cria"].diff().dt.total_seconds() / 3600
+    mtbf = intervalo_h.groupby(ordenado["eq"]).mean()
+    contagem = os_df["eq"].value_counts()
+
+    ids = df["id"]
+    df["total_os"] = ids.map(contagem).fillna(0).astype(int)
+    df["mttr_h"] = ids.map(mttr).fillna(0.0).round(1)
+    df["mtbf_h"] = ids.map(mtbf).fillna(0.0).round(1)
+    return df
+
+
+def render_basic_metrics(equip_df: pd.DataFrame) -> None:
+    """KPIs do parque: total de equipamentos e idade média.
+
+    A idade sai de uma subtração vetorizada sobre a coluna de aquisição,
+    com ``date.today()`` avaliado uma única vez fora do laço.
+    """
+    aquisicao = pd.to_datetime(equip_df.get("data_aquisicao"), errors="coerce")
+    idades = (pd.Timestamp(date.today()) - aquisicao).dt.days / 365
+    idade_media = round(idades.dropna().mean(), 1) if idades.notna().any() else 0
+    col1, col2 = st.columns(2)
+    col1.metric("Equipamentos", len(equip_df))
+    col2.metric("Idade média (anos)", idade_media)
+
+
+def render_equipment_table(equip_df: pd.DataFrame, os_df: pd.DataFrame) -> None:
+    """Inventário de equipamentos com indicadores e status de manutenção.
+
+    A tabela é montada uma vez por conjunto de dados e guardada na
+    sessão (checagem por identidade, como na tabela de OS): reruns de
+    widget reusam o resultado em vez de reagregar tudo.
+    """
+    cacheada = st.session_state.get("_equip_table")
+    if cacheada is not None and cacheada[0] is equip_df and cacheada[1] is os_df:
+        tabela = cacheada[2]
+    else:
+        tabela = _build_equipment_table(equip_df, os_df)
+        # Status direto da coluna de totais que a tabela já tem, em uma
+        # única seleção vetorizada — sem laço nem recontagem por linha.
+        totais = tabela["total_os"].to_numpy()
+        # Categórica: três rótulos repetidos viram códigos int8 em vez de
+        # uma string Python por linha — menos memória na sessão e menos
+        # bytes na serialização da tabela para o navegador.
+        tabela["status"] = pd.Categorical(
+            np.select(
+                [totais == 0, totais <= 3],
+                ["Sem chamados", "Estável"],
+                default="Crítico",
+            ),
+            categories=["Sem chamados", "Estável", "Crítico"],
+        )
+        st.session_state["_equip_table"] = (equip_df, os_df, tabela)
+    st.subheader("Inventário de equipamentos")
+    st.dataframe(tabela, use_container_width=True)
+    # Os bytes do CSV são gerados uma vez por tabela e guardados na
+    # sessão — o encode não roda de novo a cada interação de widget.
+    csv_cacheado = st.session_state.get("_equip_csv")
+    if csv_cacheado is None or csv_cacheado[0] is not tabela:
+        csv_cacheado = (tabela, tabela.to_csv(index=False).encode())
+        st.session_state["_equip_csv"] = csv_cacheado
+    st.download_button(
+        "Baixar CSV",
+        csv_cacheado[1],
+        file_name="equipamentos.csv",
+        mime="text/csv",
+    )
+
+
+def render_maintenance_history(os_df: pd.DataFrame) -> None:
+    """Gráfico mensal de MTTR e MTBF dos chamados corretivos.
+
+    Histórico vazio sai cedo, sem montar frame nenhum; com dados, o
+    ``hist_df`` é memoizado na sessão por identidade do ``os_df`` para
+    que reruns de widget não reagreguem a mesma série.
+    """
+    st.subheader("Histórico de manutenção")
+    if os_df.empty:
+        st.info("Nenhum chamado corretivo no histórico.")
+        return
+    cacheado = st.session_state.get("_hist_df")
+    if cacheado is not None and cacheado[0] is os_df:
+        hist_df = cacheado[1]
+    else:
+        hist_df = _build_history_df(os_df)
+        st.session_state["_hist_df"] = (os_df, hist_df)
+    if hist_df.empty:
+        st.info("Nenhum chamado corretivo com data válida no histórico.")
+        return
+    st.line_chart(hist_df, x="mes", y=["mttr_h", "mtbf_h"])
+
+
+def render_advanced_analysis(stats_df: pd.DataFrame) -> None:
+    """Volume mensal de chamados, com os dados já buscados pelo ``main``."""
+    st.subheader("Chamados corretivos por mês")
+    if stats_df.empty:
+        st.info("Sem chamados para analisar.")
+        return
+    st.bar_chart(stats_df, x="mes", y="chamados")
+
+
+def render_reliability_rankings(tabela: pd.DataFrame) -> None:
+    """Ranking dos equipamentos por MTBF, com os dados já buscados."""
+    st.subheader("Ranking de confiabilidade (MTBF)")
+    if tabela.empty:
+        st.info("Nenhum equipamento com chamados no histórico.")
+        return
+    com_chamados = tabela[tabela["total_os"] > 0]
+    if com_chamados.empty:
+        st.info("Nenhum equipamento com chamados no histórico.")
+        return
+    ranking = com_chamados.sort_values("mtbf_h", ascending=False)
+    st.dataframe(ranking.head(10), use_container_width=True)
+
+
+def main() -> None:
+    st.title("Equipamentos - COMG")
+    client = _client()
+    # Esqueleto primeiro: os contêineres reservam o lugar de cada seção
+    # na ordem da página e são preenchidos conforme cada busca termina —
+    # a primeira pintura não espera a busca mais lenta, e as três buscas
+    # continuam em voo em paralelo no loop de fundo.
+    area_inventario = st.container()
+    area_historico = st.container()
+    area_stats = st.container()
+    area_ranking = st.container()
+
+    futuros = {
+        submit_async(fetch_equipment_data_async(client)): "inventario",
+        submit_async(fetch_advanced_stats_async(client)): "stats",
+        submit_async(fetch_mttf_mtbf_cached(client)): "ranking",
+    }
+    for futuro in concurrent.futures.as_completed(futuros):
+        secao = futuros[futuro]
+        try:
+            resultado = futuro.result()
+        except Exception:
+            if secao == "inventario":
+                raise
+            resultado = pd.DataFrame()
+        if secao == "inventario":
+            equip_df, os_df = resultado
+            with area_inventario:
+                render_basic_metrics(equip_df)
+                render_equipment_table(equip_df, os_df)
+            with area_historico:
+                render_maintenance_history(os_df)
+        elif secao == "stats":
+            with area_stats:
+                render_advanced_analysis(resultado)
+        else:
+            with area_ranking:
+                render_reliability_rankings(resultado)
+
+
+main()
@@ -0,0 +1,244 @@
+"""Dashboard das ordens de serviço de manutenção do COMG.
+
+Página Streamlit extraída de ``analise.ipynb``: busca as OS do período na
+API do Arkmeds, calcula os indicadores e renderiza os KPIs e o resumo de
+fechamento por categoria.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import time
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from app.models import METRIC_FIELDS, OSMetrics
+from app.services.arkmeds_client import ArkmedsClient
+from app.services.repository import (
+    calculate_sla_sync,
+    compute_metrics_cached,
+    get_orders_df,
+)
+from app.services.sync import (
+    BATCH_SIZE,
+    BackfillSync,
+    has_orders,
+    run_incremental_sync,
+    should_run_incremental_sync,
+)
+from app.utils.async_utils import run_async_safe
+
+TABLE_PAGE_SIZE = 20
+
+# Cache em memória do processo para resultados de fetch: reruns e outras
+# sessões com o mesmo período nem tocam o event loop, sem pickle nem disco.
+# Cada entrada carrega o instante em que foi gravada; depois do TTL o
+# período é buscado de novo, o que mantém alcançável a checagem de sync
+# incremental dentro de ``fetch_os_data_async``.
+_MEM_CACHE: dict[tuple, tuple[float, tuple]] = {}
+_MEM_CACHE_MAX = 32
+_MEM_CACHE_TTL = 900  # segundos, mesmo ttl do st.cache_data que substituiu
+
+_COLUNAS_OBRIGATORIAS = frozenset(
+    {"id", "estado", "tipo_servico", "quadro", "data_criacao", "data_fechamento"}
+)
+
+_METRIC_LABELS = {
+    "corrective_building": "Corretivas predial",
+    "corrective_engineering": "Corretivas eng. clínica",
+    "preventive_building": "Preventivas predial",
+    "preventive_infra": "Preventivas infra",
+    "active_search": "Busca ativa",
+}
+
+
+async def fetch_os_data_async(
+    client: ArkmedsClient, dt_ini: date, dt_fim: date
+) -> tuple[OSMetrics, pd.DataFrame]:
+    """Sincroniza o banco local e devolve métricas e o frame de OS.
+
+    Banco vazio dispara o backfill em lotes grandes; caso contrário só a
+    janela desde a última OS gravada é buscada. As contagens saem de uma
+    única agregação no SQLite e o frame devolvido vem direto de
+    ``get_orders_df`` — nada de reexplodir os modelos em dicts só para
+    montar outro DataFrame na renderização.
+    """
+    if not has_orders():
+        await BackfillSync(client).run_backfill(("orders",), batch_size=BATCH_SIZE)
+    elif should_run_incremental_sync("orders"):
+        await run_incremental_sync(client)
+    metrics = compute_metrics_cached(dt_ini, dt_fim)
+    os_df = get_orders_df(dt_ini, dt_fim)
+    # Validação direto no frame que já temos — sem montar um DataFrame
+    # descartável só para conferir o formato dos dados.
+    faltantes = _COLUNAS_OBRIGATORIAS - set(os_df.columns)
+    if faltantes:
+        raise ValueError(f"Colunas ausentes no banco de OS: {sorted(faltantes)}")
+    fechadas_df = os_df[os_df["estado"] == "Fechada"]
+    # O fechamento não é limitado pela janela de consulta (uma OS criada
+    # no período pode fechar bem depois), então não dá para assumir SLA
+    # cumprido em janelas curtas — o cálculo vetorizado já é barato.
+    metrics.sla_percentage = calculate_sla_sync(fechadas_df)
+    return metrics, os_df
+
+
+async def show_active_filters_async(client: ArkmedsClient) -> dict[int, str]:
+    """Resolve na API os rótulos de estado usados nos filtros ativos."""
+    return await client.get_estados()
+
+
+def render_active_filters(estados: dict[int, str], dt_ini: date, dt_fim: date) -> None:
+    st.sidebar.caption(
+        f"Período: {dt_ini:%d/%m/%Y} a {dt_fim:%d/%m/%Y} · "
+        f"Estados: {', '.join(estados.values())}"
+    )
+
+
+@st.cache_resource
+def _client() -> ArkmedsClient:
+    """Um único ``ArkmedsClient`` por processo, compartilhado entre sessões.
+
+    Recriar o cliente a cada rerun descartaria o pool keep-alive do
+    httpx e refaria o handshake TLS em toda requisição;
+    ``st.cache_resource`` guarda o objeto sem serializá-lo.
+    """
+    return ArkmedsClient.from_session()
+
+
+def _snapshot(m: OSMetrics) -> dict:
+    """Congela os campos de métricas em um dict lido uma única vez.
+
+    Os ``render_*`` abaixo fazem apenas ``snapshot[campo]`` em vez de
+    repetir ``getattr`` sobre o objeto de métricas a cada rerun.
+    """
+    extras = ("total_closed", "total_open", "sla_percentage")
+    return {k: getattr(m, k, 0) for k in METRIC_FIELDS + extras}
+
+
+def render_kpi_metrics(snapshot: dict) -> None:
+    """Mostra um ``st.metric`` por categoria de OS fechada."""
+    colunas = st.columns(len(METRIC_FIELDS) + 1)
+    for coluna, campo in zip(colunas, METRIC_FIELDS):
+        coluna.metric(_METRIC_LABELS[campo], snapshot[campo])
+    colunas[-1].metric("SLA 72h", f"{snapshot['sla_percentage']:.1f}%")
+
+
+def render_summary_chart(snapshot: dict) -> None:
+    """Gráfico de barras das OS fechadas por categoria, com o total."""
+    fechadas_total = snapshot["total_closed"]
+    resumo = pd.DataFrame(
+        {
+            "Categoria": [_METRIC_LABELS[k] for k in METRIC_FIELDS],
+            "Fechadas": [snapshot[k] for k in METRIC_FIELDS],
+        }
+    )
+    st.subheader(f"OS fechadas no período: {fechadas_total}")
+    st.caption(f"OS ainda abertas no período: {snapshot['total_open']}")
+    st.bar_chart(resumo, x="Categoria", y="Fechadas")
+
+
+@functools.lru_cache(maxsize=8)
+def _arrow_schema_for(model_cls: type) -> pa.Schema:
+    """Schema Arrow derivado uma única vez dos campos do modelo pydantic.
+
+    Evita que cada rerun refaça a inferência de tipos coluna a coluna ao
+    montar a tabela a partir de uma lista de modelos.
+    """
+    campos = []
+    for nome, campo in model_cls.model_fields.items():
+        tipo = pa.int64() if campo.annotation in (int, int | None) else pa.large_string()
+        campos.append(pa.field(nome, tipo))
+    return pa.schema(campos)
+
+
+def _to_arrow(os_data: pd.DataFrame | list) -> pa.Table:
+    """Converte a entrada da tabela (frame do SQLite ou lista) em Arrow."""
+    if isinstance(os_data, pd.DataFrame):
+        return pa.Table.from_pandas(os_data, preserve_index=False)
+    if os_data:
+        # Colunar desde a origem: uma lista por campo, preenchida em uma
+        # única passada pelos __dict__ dos modelos — sem o dict transitório
+        # por linha de model_dump.
+        schema = _arrow_schema_for(type(os_data[0]))
+        colunas: dict[str, list] = {nome: [] for nome in schema.names}
+        for o in os_data:
+            d = o.__dict__
+            for nome, valores in colunas.items():
+                valores.append(d.get(nome))
+        return pa.Table.from_pydict(colunas, schema=schema)
+    return pa.table({})
+
+
+@st.fragment
+def render_os_table(os_data: pd.DataFrame | list) -> None:
+    """Tabela detalhada das OS do período.
+
+    Roda como fragmento: trocar de página reexecuta só esta função, não
+    o fetch nem os demais gráficos. A tabela Arrow é montada uma vez por
+    conjunto de dados (cacheada na sessão) e cada página sai de um
+    ``Table.slice`` O(1) antes de cruzar o fio até o navegador.
+    """
+    cacheada = st.session_state.get("_os_table")
+    if cacheada is not None and cacheada[0] is os_data:
+        tabela = cacheada[1]
+    else:
+        tabela = _to_arrow(os_data)
+        st.session_state["_os_table"] = (os_data, tabela)
+    total = tabela.num_rows
+    if total == 0:
+        st.info("Nenhuma OS no período selecionado.")
+        return
+    st.subheader("Ordens de serviço do período")
+    paginas = max(1, -(-total // TABLE_PAGE_SIZE))
+    pagina = int(st.number_input("Página", min_value=1, max_value=paginas, value=1)) - 1
+    st.caption(f"Total de OS: {total}")
+    pagina_tbl = tabela.slice(pagina * TABLE_PAGE_SIZE, TABLE_PAGE_SIZE)
+    st.dataframe(
+        pagina_tbl.to_pandas(types_mapper=pd.ArrowDtype), use_container_width=True
+    )
+
+
+def main() -> None:
+    st.title("Indicadores de manutenção - COMG")
+    hoje = date.today()
+    dt_ini = st.sidebar.date_input("Início do período", hoje.replace(day=1))
+    dt_fim = st.sidebar.date_input("Fim do período", hoje)
+
+    client = _client()
+
+    async def _boot() -> tuple:
+        # Busca das OS e resolução dos rótulos de filtro em paralelo,
+        # compartilhando o mesmo loop e o pool de conexões do cliente.
+        return await asyncio.gather(
+            fetch_os_data_async(client, dt_ini, dt_fim),
+            show_active_filters_async(client),
+        )
+
+    chave = (dt_ini, dt_fim)
+    entrada = _MEM_CACHE.get(chave)
+    if entrada is not None and time.monotonic() - entrada[0] < _MEM_CACHE_TTL:
+        resultado = entrada[1]
+    else:
+        resultado = run_async_safe(_boot())
+        _MEM_CACHE.pop(chave, None)
+        if len(_MEM_CACHE) >= _MEM_CACHE_MAX:
+            _MEM_CACHE.pop(next(iter(_MEM_CACHE)))
+        _MEM_CACHE[chave] = (time.monotonic(), resultado)
+    (metrics, os_df), estados = resultado
+    render_active_filters(estados, dt_ini, dt_fim)
+    snapshot = _snapshot(metrics)
+    render_kpi_metrics(snapshot)
+    render_summary_chart(snapshot)
+    # O caminho comum é só conferir os KPIs: a tabela detalhada (e sua
+    # conversão para Arrow) só é montada quando pedida. O expander do
+    # Streamlit executa o corpo mesmo fechado, daí o checkbox como porta.
+    with st.expander("Detalhes das ordens de serviço", expanded=False):
+        if st.checkbox("Carregar tabela detalhada", value=False):
+            render_os_table(os_df)
+
+
+main()
@@ -0,0 +1,100 @@
+"""Cliente assíncrono da API do Arkmeds.
+
+Substitui a exportação manual da planilha ``ordens_servico.xls``: as OS são
+buscadas direto da API, paginadas, e validadas nos modelos de ``app.models``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from datetime import date
+
+import httpx
+import streamlit as st
+
+from app.models import Chamado, Equipment, ServiceOrder
+
+PAGE_SIZE = 100
+PAGE_CONCURRENCY = 15
+
+
+class ArkmedsClient:
+    def __init__(self, base_url: str, token: str) -> None:
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Authorization": f"Token {token}"},
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+        )
+
+    @classmethod
+    def from_session(cls) -> "ArkmedsClient":
+        """Monta o cliente a partir das credenciais em ``st.secrets``."""
+        cfg = st.secrets["arkmeds"]
+        return cls(cfg["base_url"], cfg["token"])
+
+    async def list_os(
+        self,
+        dt_ini: date,
+        dt_fim: date,
+        estado_ids: list[int] | None = None,
+        page_size: int = PAGE_SIZE,
+    ) -> list[ServiceOrder]:
+        """Busca todas as páginas de OS criadas no período."""
+        params: dict = {
+            "data_criacao__gte": dt_ini.isoformat(),
+            "data_criacao__lte": dt_fim.isoformat(),
+        }
+        if estado_ids:
+            params["estado__in"] = ",".join(map(str, estado_ids))
+        itens = await self._list_paged("/api/v1/os/", params, page_size)
+        return [ServiceOrder.model_validate(item) for item in itens]
+
+    async def list_equipment(self) -> list[Equipment]:
+        """Busca o inventário completo de equipamentos."""
+        itens = await self._list_paged("/api/v1/equipamentos/", {})
+        return [Equipment.model_validate(item) for item in itens]
+
+    async def list_chamados(self, params: dict | None = None) -> list[Chamado]:
+        """Busca os chamados de manutenção, filtrados pelos parâmetros dados."""
+        itens = await self._list_paged("/api/v1/chamados/", dict(params or {}))
+        return [Chamado.model_validate(item) for item in itens]
+
+    async def _list_paged(
+        self, url: str, params: dict, page_size: int = PAGE_SIZE
+    ) -> list[dict]:
+        """Busca todas as páginas de um recurso listável da API.
+
+        A primeira página informa o total; as demais são buscadas em
+        paralelo (até 15 em voo) em vez de uma a uma — a latência vira
+        a da página mais lenta, não a soma de todas.
+        """
+        params = {**params, "page_size": page_size}
+        primeira = await self._get_page(url, params, 1)
+        itens = list(primeira["results"])
+        total_paginas = math.ceil(primeira.get("count", len(itens)) / page_size)
+        if total_paginas > 1:
+            sem = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+            async def _uma(pagina: int) -> dict:
+                async with sem:
+                    return await self._get_page(url, params, pagina)
+
+            payloads = await asyncio.gather(
+                *(_uma(p) for p in range(2, total_paginas + 1))
+            )
+            for payload in payloads:
+                itens.extend(payload["results"])
+        return itens
+
+    async def _get_page(self, url: str, params: dict, pagina: int) -> dict:
+        resp = await self._http.get(url, params={**params, "page": pagina})
+        resp.raise_for_status()
+        return resp.json()
+
+    async def get_estados(self) -> dict[int, str]:
+        """Mapa id -> nome dos estados de OS, usado nos rótulos de filtro."""
+        resp = await self._http.get("/api/v1/estados/")
+        resp.raise_for_status()
+        return {item["id"]: item["nome"] for item in resp.json()}
@@ -0,0 +1,284 @@
+"""Repositório SQLite local das ordens de serviço.
+
+Guarda as OS trazidas da API do Arkmeds para que o dashboard não dependa
+de refazer chamadas a cada rerun. As métricas agregadas são calculadas
+direto no motor do SQLite, sem materializar as linhas em Python.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from app.models import METRIC_FIELDS, OSMetrics, ServiceOrder
+
+DB_PATH = Path("data/ordens.db")
+
+SLA_HORAS = 72
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    numero TEXT,
+    tipo_servico TEXT,
+    estado TEXT,
+    quadro TEXT,
+    prioridade TEXT,
+    data_criacao TEXT,
+    data_fechamento TEXT,
+    descricao TEXT,
+    categoria TEXT,
+    sha256_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_orders_data_criacao ON orders (data_criacao);
+CREATE TABLE IF NOT EXISTS sync_log (
+    resource TEXT NOT NULL,
+    synced_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics_cache (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    computed_at TEXT NOT NULL
+);
+"""
+
+
+_READ_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA query_only=1",
+)
+
+_read_conn: sqlite3.Connection | None = None
+
+
+def get_conn() -> sqlite3.Connection:
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def get_read_conn() -> sqlite3.Connection:
+    """Conexão só-leitura reutilizada pelo caminho de renderização.
+
+    O dashboard usa o SQLite apenas como cache de leitura; com WAL +
+    mmap as páginas são servidas da memória sem contenção com o escritor
+    da sincronização, e ``query_only=1`` faz qualquer escrita acidental
+    falhar em vez de invalidar o mmap. A conexão é criada uma vez por
+    processo e reaproveitada entre reruns.
+    """
+    global _read_conn
+    if _read_conn is None:
+        get_conn().close()  # garante schema antes de abrir em só-leitura
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        for pragma in _READ_PRAGMAS:
+            conn.execute(pragma)
+        _read_conn = conn
+    return _read_conn
+
+
+def _categoria(o: ServiceOrder) -> str | None:
+    """Bucket de indicador da OS, pré-calculado na gravação."""
+    if o.tipo_servico == "Manutenção Corretiva":
+        if o.quadro == "Manutenção Predial":
+            return "corrective_building"
+        if o.quadro == "Engenharia Clínica":
+            return "corrective_engineering"
+    elif o.tipo_servico == "Manutenção Preventiva":
+        if o.quadro == "Manutenção Predial":
+            return "preventive_building"
+        if o.quadro == "Infraestrutura":
+            return "preventive_infra"
+    elif o.tipo_servico == "Busca Ativa":
+        return "active_search"
+    return None
+
+
+def order_hash(o: ServiceOrder) -> str:
+    """Hash de conteúdo da OS, usado para pular regravações idênticas."""
+    return hashlib.sha256(o.model_dump_json().encode()).hexdigest()
+
+
+def get_all_order_hashes() -> dict[int, str]:
+    """Mapa id -> hash de conteúdo de todas as OS, em uma consulta só."""
+    with get_conn() as conn:
+        return dict(conn.execute("SELECT id, sha256_hash FROM orders").fetchall())
+
+
+def save_orders(orders: list[ServiceOrder]) -> None:
+    """Insere (ou atualiza) as OS no banco local."""
+    linhas = [
+        (
+            o.id,
+            o.numero,
+            o.tipo_servico,
+            o.estado,
+            o.quadro,
+            o.prioridade,
+            o.data_criacao,
+            o.data_fechamento,
+            o.descricao,
+            _categoria(o),
+            order_hash(o),
+        )
+        for o in orders
+    ]
+    with get_conn() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO orders VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            linhas,
+        )
+
+
+READ_CHUNK_SIZE = 500
+
+
+def _periodo_params(dt_ini: date, dt_fim: date) -> tuple[str, str]:
+    """Limites do período como strings ISO comparáveis lexicograficamente.
+
+    Comparar a coluna crua (sem envolver ``date()`` em cada linha) deixa
+    o predicado usar o índice de ``data_criacao`` em range scan.
+    """
+    return dt_ini.isoformat(), (dt_fim + timedelta(days=1)).isoformat()
+
+
+# Tipos Arrow das colunas de ``orders``, na ordem do schema SQL.
+_ORDERS_ARROW_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("numero", pa.large_string()),
+        ("tipo_servico", pa.large_string()),
+        ("estado", pa.large_string()),
+        ("quadro", pa.large_string()),
+        ("prioridade", pa.large_string()),
+        ("data_criacao", pa.large_string()),
+        ("data_fechamento", pa.large_string()),
+        ("descricao", pa.large_string()),
+        ("categoria", pa.large_string()),
+        ("sha256_hash", pa.large_string()),
+    ]
+)
+
+
+def iter_orders_batches(dt_ini: date, dt_fim: date, chunksize: int = READ_CHUNK_SIZE):
+    """Gera as OS do período em lotes Arrow, sem carregar tudo de uma vez.
+
+    As linhas do cursor vão direto para colunas Arrow tipadas — sem o
+    desvio por um DataFrame intermediário que encaixota cada valor em
+    objeto Python e reconsolida blocos a cada lote.
+    """
+    cur = get_read_conn().execute(
+        "SELECT * FROM orders WHERE data_criacao >= ? AND data_criacao < ?",
+        _periodo_params(dt_ini, dt_fim),
+    )
+    nomes = _ORDERS_ARROW_SCHEMA.names
+    while True:
+        rows = cur.fetchmany(chunksize)
+        if not rows:
+            break
+        colunas = dict(zip(nomes, map(list, zip(*rows))))
+        yield pa.Table.from_pydict(colunas, schema=_ORDERS_ARROW_SCHEMA)
+
+
+def get_orders_df(dt_ini: date, dt_fim: date) -> pd.DataFrame:
+    """Linhas de OS do período, como DataFrame.
+
+    Lê em lotes e concatena no lado Arrow — o pico de memória fica no
+    tamanho de um lote, não no período inteiro duplicado.
+    """
+    tabelas = list(iter_orders_batches(dt_ini, dt_fim))
+    if not tabelas:
+        # Período sem OS: frame vazio mas com as colunas do schema, para
+        # que os consumidores não precisem tratar o caso à parte.
+        return _ORDERS_ARROW_SCHEMA.empty_table().to_pandas()
+    tabela = pa.concat_tables(tabelas)
+    return tabela.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def calculate_sla_sync(closed_orders: pd.DataFrame | list[ServiceOrder]) -> float:
+    """Percentual de OS fechadas dentro do SLA de 72 horas.
+
+    Aceita o frame vindo do SQLite ou uma lista de modelos. As datas são
+    convertidas em duas passadas vetorizadas de ``pd.to_datetime`` e a
+    diferença é calculada em bloco — nenhum ``fromisoformat`` por linha
+    no interpretador.
+    """
+    if len(closed_orders) == 0:
+        return 0.0
+    if isinstance(closed_orders, pd.DataFrame):
+        criadas_raw = closed_orders["data_criacao"]
+        fechadas_raw = closed_orders["data_fechamento"]
+    else:
+        criadas_raw = [o.data_criacao for o in closed_orders]
+        fechadas_raw = [o.data_fechamento for o in closed_orders]
+    criadas = pd.DatetimeIndex(
+        pd.to_datetime(criadas_raw, utc=True, errors="coerce", format="ISO8601")
+    )
+    fechadas = pd.DatetimeIndex(
+        pd.to_datetime(fechadas_raw, utc=True, errors="coerce", format="ISO8601")
+    )
+    horas = (fechadas - criadas).total_seconds().to_numpy() / 3600.0
+    dentro = np.count_nonzero((horas <= SLA_HORAS) & ~np.isnan(horas))
+    return round(dentro / len(closed_orders) * 100, 1)
+
+
+def compute_metrics_from_sqlite_data(dt_ini: date, dt_fim: date) -> OSMetrics:
+    """Métricas do período calculadas por agregação dentro do SQLite.
+
+    Só as contagens por categoria cruzam a fronteira SQLite -> Python;
+    nenhuma linha de OS é materializada para responder aos 6 números.
+    """
+    sql = """
+        SELECT categoria,
+               COUNT(*) FILTER (WHERE estado = 'Fechada') AS fechadas,
+               COUNT(*) FILTER (WHERE estado <> 'Fechada') AS abertas
+        FROM orders
+        WHERE categoria IS NOT NULL
+          AND data_criacao >= ? AND data_criacao < ?
+        GROUP BY categoria
+    """
+    rows = get_read_conn().execute(sql, _periodo_params(dt_ini, dt_fim)).fetchall()
+    fechadas = {categoria: n for categoria, n, _ in rows}
+    campos = {k: fechadas.get(k, 0) for k in METRIC_FIELDS}
+    return OSMetrics(
+        total_closed=sum(campos.values()),
+        total_open=sum(abertas for _, _, abertas in rows),
+        **campos,
+    )
+
+
+def _latest_sync_ts() -> str:
+    row = get_read_conn().execute("SELECT MAX(synced_at) FROM sync_log").fetchone()
+    return row[0] or ""
+
+
+def compute_metrics_cached(dt_ini: date, dt_fim: date) -> OSMetrics:
+    """Métricas do período com cache persistente em ``metrics_cache``.
+
+    A chave inclui o timestamp da última sincronização, então qualquer
+    sync novo invalida as entradas naturalmente; num hit o KPI vira um
+    único SELECT indexado, sem reagregar.
+    """
+    chave = f"{dt_ini.isoformat()}|{dt_fim.isoformat()}|{_latest_sync_ts()}"
+    row = get_read_conn().execute(
+        "SELECT payload FROM metrics_cache WHERE key = ?", (chave,)
+    ).fetchone()
+    if row is not None:
+        return OSMetrics.model_validate_json(row[0])
+    metrics = compute_metrics_from_sqlite_data(dt_ini, dt_fim)
+    with get_conn() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO metrics_cache VALUES (?, ?, ?)",
+            (chave, metrics.model_dump_json(), datetime.now(timezone.utc).isoformat()),
+        )
+    return metrics
@@ -0,0 +1,117 @@
+"""Sincronização das OS da API do Arkmeds para o banco local.
+
+Carga inicial (backfill) em lotes grandes e sincronização incremental a
+partir da última OS já gravada, para que o dashboard leia sempre do
+SQLite em vez de refazer a busca completa na API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from datetime import date, datetime, timedelta, timezone
+
+from app.models import ServiceOrder
+from app.services.arkmeds_client import ArkmedsClient
+from app.services.repository import (
+    get_all_order_hashes,
+    get_conn,
+    order_hash,
+    save_orders,
+)
+
+BATCH_SIZE = 500
+MAX_CONCURRENCY = 15
+MAX_SYNC_AGE_HOURS = 2
+BACKFILL_INICIO = date(2020, 1, 1)
+
+
+@functools.lru_cache(maxsize=1)
+def get_all_sync_ages() -> dict[str, datetime]:
+    """Última sincronização de cada recurso rastreado, em uma consulta só.
+
+    Memoizada até a próxima sincronização concluída, para que cada render
+    do dashboard não dispare uma consulta por recurso.
+    """
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT resource, MAX(synced_at) FROM sync_log GROUP BY resource"
+        ).fetchall()
+    return {recurso: datetime.fromisoformat(ts) for recurso, ts in rows}
+
+
+def _registra_sync(recurso: str) -> None:
+    with get_conn() as conn:
+        conn.execute(
+            "INSERT INTO sync_log VALUES (?, ?)",
+            (recurso, datetime.now(timezone.utc).isoformat()),
+        )
+    get_all_sync_ages.cache_clear()
+
+
+def should_run_incremental_sync(
+    recurso: str = "orders", max_age_hours: int = MAX_SYNC_AGE_HOURS
+) -> bool:
+    """Indica se o recurso está velho o bastante para sincronizar de novo."""
+    ultima = get_all_sync_ages().get(recurso)
+    if ultima is None:
+        return True
+    return datetime.now(timezone.utc) - ultima >= timedelta(hours=max_age_hours)
+
+
+def _apenas_alteradas(orders: list[ServiceOrder]) -> list[ServiceOrder]:
+    """Filtra o lote contra os hashes já gravados, em uma consulta só.
+
+    Evita regravar OS idênticas: uma leitura em bloco dos hashes e um
+    ``dict.get`` por OS, em vez de um SELECT por linha ou de INSERTs
+    redundantes a cada sincronização.
+    """
+    existentes = get_all_order_hashes()
+    return [o for o in orders if existentes.get(o.id) != order_hash(o)]
+
+
+class BackfillSync:
+    """Carga inicial do banco local a partir da API."""
+
+    def __init__(self, client: ArkmedsClient) -> None:
+        self._client = client
+
+    async def run_backfill(
+        self,
+        resources: tuple[str, ...] = ("orders",),
+        batch_size: int = BATCH_SIZE,
+    ) -> None:
+        """Backfill dos recursos em paralelo, com concorrência limitada."""
+        sem = asyncio.Semaphore(MAX_CONCURRENCY)
+
+        async def _um(recurso: str) -> None:
+            async with sem:
+                await self._backfill_resource(recurso, batch_size)
+
+        await asyncio.gather(*(_um(r) for r in resources))
+
+    async def _backfill_resource(self, recurso: str, batch_size: int) -> None:
+        if recurso != "orders":
+            return
+        orders = await self._client.list_os(
+            BACKFILL_INICIO, date.today(), page_size=batch_size
+        )
+        save_orders(_apenas_alteradas(orders))
+        _registra_sync(recurso)
+
+
+async def run_incremental_sync(client: ArkmedsClient, recurso: str = "orders") -> None:
+    """Busca apenas as OS criadas desde a última sincronização."""
+    with get_conn() as conn:
+        ultimo = conn.execute(
+            "SELECT max(date(data_criacao)) FROM orders"
+        ).fetchone()[0]
+    dt_ini = date.fromisoformat(ultimo) if ultimo else BACKFILL_INICIO
+    orders = await client.list_os(dt_ini, date.today(), page_size=BATCH_SIZE)
+    save_orders(_apenas_alteradas(orders))
+    _registra_sync(recurso)
+
+
+def has_orders() -> bool:
+    with get_conn() as conn:
+        return conn.execute("SELECT 1 FROM orders LIMIT 1").fetchone() is not None
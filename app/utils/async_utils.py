@@ -0,0 +1,41 @@
+"""Execução de corrotinas dentro do Streamlit.
+
+O Streamlit reexecuta o script a cada interação e não expõe um event loop;
+mantemos um loop persistente em uma thread de fundo e despachamos as
+corrotinas para ele, preservando o pool de conexões HTTP entre reruns.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Coroutine
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=_loop.run_forever, daemon=True)
+            thread.start()
+        return _loop
+
+
+def run_async_safe(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Roda ``coro`` no loop persistente e bloqueia até o resultado."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+
+def submit_async(coro: Coroutine[Any, Any, Any]) -> concurrent.futures.Future:
+    """Agenda ``coro`` no loop persistente sem bloquear e devolve o future.
+
+    Usado para renovações de cache em segundo plano e para renderização
+    progressiva: o chamador decide se ignora o future ou se consome os
+    resultados conforme ficam prontos (``concurrent.futures.as_completed``).
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop())